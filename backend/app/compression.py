@@ -0,0 +1,285 @@
+import zlib
+from typing import List, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_CHUNK_SIZE = 64 * 1024
+_COMPRESSIBLE_MARKERS = ("json", "javascript", "xml", "csv")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_DECODE_ERRORS: Tuple[type, ...] = (zlib.error,)
+if zstandard is not None:
+    _DECODE_ERRORS += (zstandard.ZstdError,)
+
+
+def available_encodings() -> List[str]:
+    """Encodings de resposta suportados, na ordem de preferencia do servidor."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    best = None
+    best_q = 0.0
+    for encoding in available_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=4)
+        else:
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def finish(self) -> bytes:
+        return self._obj.finish() if self.encoding == "br" else self._obj.flush()
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+class _InvalidBody(Exception):
+    pass
+
+
+# Um bloco zstd expande no maximo 128 KiB a partir de 4 bytes (bloco RLE), entao
+# alimentar o decompressobj em fatias pequenas limita quanto cada chamada pode
+# produzir alem do teto (~4 MiB por fatia de 128 bytes).
+_ZSTD_INPUT_SLICE = 128
+
+
+class _StreamDecoder:
+    """Descomprime o corpo da requisicao mensagem a mensagem, com teto de tamanho.
+
+    Aceita um unico membro gzip ou um unico frame zstd; qualquer byte depois
+    do fim do stream e rejeitado.
+    """
+
+    def __init__(self, encoding: str, max_bytes: int):
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.size = 0
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def _check(self, out: bytes) -> bytes:
+        self.size += len(out)
+        if self.size > self.max_bytes:
+            raise _RequestTooLarge()
+        return out
+
+    def feed(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+        if self._obj.eof:
+            raise _InvalidBody("dados apos o fim do stream")
+        out = bytearray()
+        if self.encoding == "zstd":
+            for i in range(0, len(data), _ZSTD_INPUT_SLICE):
+                out += self._check(self._obj.decompress(data[i:i + _ZSTD_INPUT_SLICE]))
+                if self._obj.eof:
+                    if self._obj.unused_data or i + _ZSTD_INPUT_SLICE < len(data):
+                        raise _InvalidBody("dados apos o fim do frame zstd")
+                    break
+            return bytes(out)
+        while data:
+            out += self._check(self._obj.decompress(data, _CHUNK_SIZE))
+            data = self._obj.unconsumed_tail
+        if self._obj.unused_data:
+            raise _InvalidBody("dados apos o fim do membro gzip")
+        return bytes(out)
+
+    def finish(self) -> bytes:
+        out = b"" if self.encoding == "zstd" else self._check(self._obj.flush())
+        if not self._obj.eof:
+            raise _InvalidBody("stream comprimido incompleto")
+        return out
+
+
+class CompressionMiddleware:
+    """Comprime respostas (zstd/br/gzip) e aceita corpos com Content-Encoding gzip ou zstd.
+
+    O corpo da requisicao e descomprimido conforme cada mensagem chega e
+    abortado com 413 assim que passa de max_request_bytes, antes de chegar a rota.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, max_request_bytes: int = 20 * 1024 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_request_bytes = max_request_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        request_encoding = headers.get("content-encoding", "").strip().lower()
+        if request_encoding and request_encoding != "identity":
+            decoded = await self._decode_request(scope, receive, send, request_encoding)
+            if decoded is None:
+                return
+            scope, receive = decoded
+
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressedResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+    async def _decode_request(
+        self, scope: Scope, receive: Receive, send: Send, encoding: str
+    ) -> Tuple[Scope, Receive] | None:
+        if encoding != "gzip" and not (encoding == "zstd" and zstandard is not None):
+            await JSONResponse({"detail": "Content-Encoding nao suportado"}, status_code=415)(scope, receive, send)
+            return None
+
+        decoder = _StreamDecoder(encoding, self.max_request_bytes)
+        decoded = bytearray()
+        received = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return None
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                if received > self.max_request_bytes:
+                    raise _RequestTooLarge()
+                decoded += decoder.feed(chunk)
+                more_body = message.get("more_body", False)
+            decoded += decoder.finish()
+        except _RequestTooLarge:
+            await JSONResponse({"detail": "corpo excede o tamanho maximo"}, status_code=413)(scope, receive, send)
+            return None
+        except (_InvalidBody,) + _DECODE_ERRORS:
+            await JSONResponse({"detail": "corpo comprimido invalido"}, status_code=400)(scope, receive, send)
+            return None
+        body = bytes(decoded)
+
+        new_scope = dict(scope)
+        raw_headers = [
+            (k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")
+        ]
+        raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        new_scope["headers"] = raw_headers
+
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return new_scope, replay
+
+
+class _CompressedResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send | None = None
+        self.start_message: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").lower()
+            self.passthrough = "content-encoding" in headers or not (
+                content_type.startswith("text/") or any(m in content_type for m in _COMPRESSIBLE_MARKERS)
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start = self.start_message
+            self.start_message = None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = _Compressor(self.encoding)
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+            del headers["Content-Length"]
+            await self.send(start)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
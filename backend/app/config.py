@@ -23,5 +23,36 @@ class Settings:
         t.strip() for t in os.getenv("UPLOAD_ALLOWED_TYPES", "image/jpeg,image/png").split(",") if t.strip()
     ]
     upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", "20971520"))
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    request_max_decompressed_bytes: int = int(
+        os.getenv("REQUEST_MAX_DECOMPRESSED_BYTES") or os.getenv("UPLOAD_MAX_BYTES", "20971520")
+    )
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    rate_limit_user_per_minute: int = int(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "60"))
+    rate_limit_user_burst: int = int(os.getenv("RATE_LIMIT_USER_BURST", "20"))
+    rate_limit_login_per_minute: int = int(os.getenv("RATE_LIMIT_LOGIN_PER_MINUTE", "10"))
+    rate_limit_login_burst: int = int(os.getenv("RATE_LIMIT_LOGIN_BURST", "5"))
+    rate_limit_login_ip_per_minute: int = int(os.getenv("RATE_LIMIT_LOGIN_IP_PER_MINUTE", "120"))
+    rate_limit_login_ip_burst: int = int(os.getenv("RATE_LIMIT_LOGIN_IP_BURST", "30"))
+    heavy_max_concurrency: int = int(os.getenv("HEAVY_MAX_CONCURRENCY", "8"))
+    heavy_queue_timeout: float = float(os.getenv("HEAVY_QUEUE_TIMEOUT", "2"))
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "1") == "1"
+    metrics_dir: str = os.getenv("METRICS_DIR", "")
+    metrics_flush_interval: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    metrics_stale_seconds: float = float(os.getenv("METRICS_STALE_SECONDS", "300"))
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "0") == "1"
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    profiling_interval_ms: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    profiling_dir: str = os.getenv("PROFILING_DIR", "./profiles")
+    profiling_secret: str = os.getenv("PROFILING_SECRET", "")
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "0"))
+    slow_request_query_count: int = int(os.getenv("SLOW_REQUEST_QUERY_COUNT", "0"))
+    gc_grace_seconds: int = int(os.getenv("GC_GRACE_SECONDS", "604800"))
+    gc_batch_size: int = int(os.getenv("GC_BATCH_SIZE", "500"))
+    gc_max_batches: int = int(os.getenv("GC_MAX_BATCHES", "20"))
+    gc_interval_seconds: int = int(os.getenv("GC_INTERVAL_SECONDS", "0"))
+    gc_checkpoint_path: str = os.getenv("GC_CHECKPOINT_PATH", "./storage_gc_checkpoint.json")
+    payload_compression: str = os.getenv("PAYLOAD_COMPRESSION", "zlib").strip().lower()
+    payload_compression_level: int = int(os.getenv("PAYLOAD_COMPRESSION_LEVEL", "6"))
 
 settings = Settings()
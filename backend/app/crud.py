@@ -1,13 +1,19 @@
+import math
 import os
 import uuid
-from typing import Any, Dict
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
 
 from app import models
+from app import geo
 from app.storage import save_data_url
 from app.config import settings
 
 PHOTO_KEYS = ("photosUploads", "photos_uploads")
+NEAREST_MAX_RADIUS_KM = 500.0
+NEAREST_MAX_ROWS = 2000
+NEAREST_START_RADIUS_KM = 1.0
 
 def _extract_photos(payload: Dict[str, Any]) -> Dict[str, Any]:
     for key in PHOTO_KEYS:
@@ -101,5 +107,119 @@ def _save_photos(db: Session, relatorio: models.Relatorio, photos: Dict[str, Any
                 path=path_or_url,
                 coords_lat=coords.get("lat"),
                 coords_lng=coords.get("lng"),
+                geohash=_geohash_for(coords.get("lat"), coords.get("lng")),
             )
-            db.add(foto)
+            db.add(foto)
+
+def _geohash_for(lat: Any, lng: Any) -> str | None:
+    try:
+        lat_f = float(lat)
+        lng_f = float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat_f <= 90.0 and -180.0 <= lng_f <= 180.0):
+        return None
+    return geo.encode_geohash(lat_f, lng_f)
+
+def _fotos_in_cells(db: Session, user_id: str, cells) -> Any:
+    # O filtro de usuario vai num EXISTS (has) para o planner partir do indice
+    # de geohash; com JOIN + user_id o SQLite prefere varrer as fotos do usuario.
+    return (
+        db.query(models.Foto)
+        .options(joinedload(models.Foto.relatorio))
+        .filter(
+            models.Foto.relatorio.has(models.Relatorio.user_id == user_id),
+            # Faixa [cell, cell~) em vez de LIKE: '~' vem depois de todo caractere
+            # base32 e a faixa usa o indice tambem no SQLite, onde LIKE nao usa.
+            or_(*[
+                and_(models.Foto.geohash >= cell, models.Foto.geohash < f"{cell}~")
+                for cell in sorted(cells)
+            ]),
+        )
+    )
+
+def fotos_in_bbox(
+    db: Session,
+    user_id: str,
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    limit: int,
+) -> List[models.Foto]:
+    cells = geo.covering_cells(min_lat, min_lng, max_lat, max_lng)
+    return (
+        _fotos_in_cells(db, user_id, cells)
+        .filter(
+            models.Foto.coords_lat >= min_lat,
+            models.Foto.coords_lat <= max_lat,
+            models.Foto.coords_lng >= min_lng,
+            models.Foto.coords_lng <= max_lng,
+        )
+        .limit(limit)
+        .all()
+    )
+
+def fotos_nearest(
+    db: Session,
+    user_id: str,
+    lat: float,
+    lng: float,
+    k: int,
+    raio_km: float | None = None,
+) -> List[Tuple[models.Foto, float]]:
+    """Retorna as k fotos mais proximas do ponto (ate raio_km), com a distancia em km.
+
+    Busca nas celulas que cobrem um circulo pequeno e o quadruplica ate achar
+    k fotos dentro dele ou chegar a raio_km (padrao NEAREST_MAX_RADIUS_KM).
+    Cada passo carrega no maximo NEAREST_MAX_ROWS fotos, as mais proximas por
+    uma distancia aproximada calculada no banco.
+    """
+    raio_km = min(raio_km or NEAREST_MAX_RADIUS_KM, NEAREST_MAX_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    d_lat = models.Foto.coords_lat - lat
+    d_lng = (models.Foto.coords_lng - lng) * cos_lat
+    radius = min(NEAREST_START_RADIUS_KM, raio_km)
+    while True:
+        rows = (
+            _fotos_in_cells(db, user_id, geo.radius_cells(lat, lng, radius))
+            .filter(models.Foto.coords_lat.isnot(None), models.Foto.coords_lng.isnot(None))
+            .order_by(d_lat * d_lat + d_lng * d_lng)
+            .limit(NEAREST_MAX_ROWS)
+            .all()
+        )
+        found = []
+        for foto in rows:
+            dist = geo.haversine_km(lat, lng, float(foto.coords_lat), float(foto.coords_lng))
+            if dist <= radius:
+                found.append((foto, dist))
+        # Todo ponto a ate radius km esta nas celulas, entao k achados ja sao os k mais proximos.
+        if len(found) >= k or radius >= raio_km:
+            found.sort(key=lambda item: item[1])
+            return found[:k]
+        radius = min(radius * 4, raio_km)
+
+def backfill_geohash(db: Session, batch_size: int = 1000) -> int:
+    total = 0
+    last_id = ""
+    while True:
+        fotos = (
+            db.query(models.Foto)
+            .filter(
+                models.Foto.id > last_id,
+                models.Foto.geohash.is_(None),
+                models.Foto.coords_lat.isnot(None),
+                models.Foto.coords_lng.isnot(None),
+            )
+            .order_by(models.Foto.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not fotos:
+            return total
+        for foto in fotos:
+            foto.geohash = _geohash_for(foto.coords_lat, foto.coords_lng)
+            if foto.geohash:
+                total += 1
+        last_id = fotos[-1].id
+        db.commit()
@@ -1,9 +1,18 @@
+import logging
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app import metrics
+from app.config import settings
+from app.request_context import RequestContext, current_request, request_end_hooks
+
+logger = logging.getLogger(__name__)
+
 _env_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=_env_path)
 
@@ -14,6 +23,66 @@ if not DATABASE_URL:
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
 
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    ctx = current_request.get()
+    if ctx is not None and ctx.thread_ids is not None:
+        # O handler pode rodar em outra thread do threadpool que a das dependencias.
+        ctx.thread_ids.add(threading.get_ident())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    ctx = current_request.get()
+    route = ctx.route if ctx is not None else "none"
+    if ctx is not None:
+        ctx.query_count += 1
+        ctx.query_seconds += elapsed
+    metrics.db_query_duration.observe(elapsed, route)
+    if settings.slow_query_ms and elapsed * 1000.0 >= settings.slow_query_ms:
+        if ctx is not None:
+            ctx.slow_queries += 1
+        logger.warning(
+            "consulta lenta (%.1f ms) rota=%s params=%s sql=%s",
+            elapsed * 1000.0,
+            route,
+            _params_shape(parameters, executemany),
+            " ".join(statement.split())[:2000],
+        )
+
+
+def _params_shape(parameters, executemany: bool) -> str:
+    """Descreve os parametros sem expor valores (tipos e quantidade)."""
+    if executemany and parameters:
+        return f"{len(parameters)}x{_params_shape(parameters[0], False)}"
+    if isinstance(parameters, dict):
+        return "{" + ",".join(f"{k}:{type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ",".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _log_request_queries(ctx: RequestContext, status: str, elapsed: float) -> None:
+    too_many = settings.slow_request_query_count and ctx.query_count >= settings.slow_request_query_count
+    if ctx.slow_queries or too_many:
+        logger.warning(
+            "requisicao %s %s (%s) em %.1f ms: %d consultas, %.1f ms no banco, %d lentas",
+            ctx.method,
+            ctx.route,
+            status,
+            elapsed * 1000.0,
+            ctx.query_count,
+            ctx.query_seconds * 1000.0,
+            ctx.slow_queries,
+        )
+
+
+request_end_hooks.append(_log_request_queries)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -1,5 +1,68 @@
-from .db import engine
-from .models import Base
+import json
+
+from sqlalchemy import bindparam, inspect, text
+
+from .db import engine, SessionLocal
+from .models import Base, Foto, Relatorio
+from .crud import backfill_geohash
+
+
+def migrate_foto_geohash() -> None:
+    """Adiciona fotos.geohash e seus indices em bancos criados antes da coluna."""
+    columns = {c["name"] for c in inspect(engine).get_columns("fotos")}
+    if "geohash" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE fotos ADD COLUMN geohash VARCHAR(12)"))
+    for index in Foto.__table__.indexes:
+        if index.name in ("ix_fotos_geohash", "ix_fotos_coords"):
+            index.create(bind=engine, checkfirst=True)
+
+
+def migrate_legacy_payloads(batch_size: int = 500) -> int:
+    """Move o antigo relatorios.payload (JSON) para relatorio_payloads.
+
+    Cada lote copiado e zerado na tabela principal na mesma transacao; ao
+    final a coluna antiga e removida para a tabela realmente encolher.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("relatorios")}
+    if "payload" not in columns:
+        return 0
+    total = 0
+    last_id = ""
+    with SessionLocal() as db:
+        while True:
+            rows = db.execute(
+                text(
+                    "SELECT r.id, r.payload FROM relatorios r "
+                    "LEFT JOIN relatorio_payloads p ON p.relatorio_id = r.id "
+                    "WHERE p.relatorio_id IS NULL AND r.id > :last_id "
+                    "ORDER BY r.id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": batch_size},
+            ).all()
+            if not rows:
+                break
+            for relatorio_id, raw in rows:
+                relatorio = db.get(Relatorio, relatorio_id)
+                relatorio.payload = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+                total += 1
+            db.flush()
+            db.execute(
+                text("UPDATE relatorios SET payload = NULL WHERE id IN :ids").bindparams(
+                    bindparam("ids", expanding=True)
+                ),
+                {"ids": [row[0] for row in rows]},
+            )
+            last_id = rows[-1][0]
+            db.commit()
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE relatorios DROP COLUMN payload"))
+    return total
+
 
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    migrate_foto_geohash()
+    migrate_legacy_payloads()
+    with SessionLocal() as db:
+        backfill_geohash(db)
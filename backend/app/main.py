@@ -1,16 +1,44 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.compression import CompressionMiddleware
 from app.config import settings
+from app.metrics import observe_request, start_flusher
+from app.profiling import ProfilingMiddleware
+from app.request_context import RequestContextMiddleware, bind_route, mark_thread, request_end_hooks
 from app.routers.relatorios import router as relatorios_router
 from app.routers.rascunhos import router as rascunhos_router
 from app.routers.uploads import router as uploads_router
 from app.routers.config import router as config_router
 from app.routers.auth import router as auth_router
+from app.routers.fotos import router as fotos_router
+from app.routers.metrics import router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Threads de fundo so sobem quando o servidor inicia, nao ao importar o modulo.
+    stops = []
+    if settings.metrics_enabled and settings.metrics_dir:
+        stops.append(start_flusher())
+    if settings.gc_interval_seconds > 0:
+        from app.storage_gc import start_background_gc
+
+        stops.append(start_background_gc())
+    yield
+    for stop in stops:
+        stop.set()
+
 
+global_dependencies = [Depends(bind_route)]
+if settings.profiling_enabled:
+    # Dependencia sincrona custa um salto no threadpool; so vale com o perfil ligado.
+    global_dependencies.append(Depends(mark_thread))
 
-app = FastAPI(title="Relatorio de Visita Externa API")
+app = FastAPI(title="Relatorio de Visita Externa API", lifespan=lifespan, dependencies=global_dependencies)
 
 origins = settings.cors_origins
 if origins:
@@ -22,6 +50,21 @@ if origins:
         allow_headers=["*"],
     )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    max_request_bytes=settings.request_max_decompressed_bytes,
+)
+
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(RequestContextMiddleware)
+
+if settings.metrics_enabled:
+    request_end_hooks.append(observe_request)
+    app.include_router(metrics_router)
+
 if settings.storage_backend == "local":
     app.mount("/storage", StaticFiles(directory=settings.storage_dir), name="storage")
 
@@ -30,3 +73,4 @@ app.include_router(rascunhos_router, prefix="/api")
 app.include_router(uploads_router, prefix="/api")
 app.include_router(config_router, prefix="/api")
 app.include_router(auth_router, prefix="/api")
+app.include_router(fotos_router, prefix="/api")
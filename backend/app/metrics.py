@@ -0,0 +1,209 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from app.config import settings
+from app.request_context import RequestContext
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labels] = entry
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(k), [list(v[0]), v[1], v[2]]] for k, v in self._values.items()]
+
+
+REGISTRY: List = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+http_request_duration = _register(Histogram(
+    "http_request_duration_seconds", "Duracao das requisicoes HTTP", ("method", "route", "status"),
+))
+db_queries_per_request = _register(Histogram(
+    "db_queries_per_request", "Consultas SQL por requisicao", ("route",), buckets=COUNT_BUCKETS,
+))
+db_query_duration = _register(Histogram(
+    "db_query_duration_seconds", "Duracao de cada consulta SQL", ("route",), buckets=QUERY_BUCKETS,
+))
+storage_duration = _register(Histogram(
+    "storage_operation_duration_seconds", "Duracao das gravacoes e presigns no storage", ("operation",),
+))
+photo_bytes_ingested = _register(Counter(
+    "photo_bytes_ingested_total", "Bytes de fotos gravados pelo backend",
+))
+storage_gc_deleted = _register(Counter(
+    "storage_gc_deleted_total", "Arquivos orfaos removidos do storage pelo GC",
+))
+
+
+def snapshot() -> Dict[str, dict]:
+    return {
+        m.name: {"kind": m.kind, "samples": m.snapshot()}
+        for m in REGISTRY
+    }
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.metrics_dir, f"metrics-{pid}.json")
+
+
+def flush_snapshot() -> None:
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def start_flusher() -> threading.Event:
+    """Grava periodicamente o snapshot deste worker em METRICS_DIR.
+
+    Com varios workers do uvicorn, /metrics soma os snapshots de todos eles.
+    Devolve o Event que encerra o loop (usado no shutdown do app).
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(settings.metrics_flush_interval):
+            try:
+                flush_snapshot()
+            except OSError:
+                pass
+
+    threading.Thread(target=loop, name="metrics-flusher", daemon=True).start()
+    return stop
+
+
+def _collect() -> Dict[str, dict]:
+    merged = snapshot()
+    if not settings.metrics_dir:
+        return merged
+    own = _snapshot_path(os.getpid())
+    cutoff = time.time() - settings.metrics_stale_seconds
+    for path in glob.glob(os.path.join(settings.metrics_dir, "metrics-*.json")):
+        if path == own:
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                continue
+            with open(path, encoding="utf-8") as f:
+                other = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, data in other.items():
+            if name not in merged:
+                continue
+            samples = {tuple(k): v for k, v in merged[name]["samples"]}
+            for labels, value in data["samples"]:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = value
+                elif data["kind"] == "counter":
+                    samples[key] = current + value
+                else:
+                    samples[key] = [
+                        [a + b for a, b in zip(current[0], value[0])],
+                        current[1] + value[1],
+                        current[2] + value[2],
+                    ]
+            merged[name]["samples"] = [[list(k), v] for k, v in samples.items()]
+    return merged
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus() -> str:
+    data = _collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in data[metric.name]["samples"]:
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, labels)} {value}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, labels)} {total}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def observe_request(ctx: RequestContext, status: str, elapsed: float) -> None:
+    http_request_duration.observe(elapsed, ctx.method, ctx.route, status)
+    db_queries_per_request.observe(ctx.query_count, ctx.route)
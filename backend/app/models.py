@@ -1,7 +1,10 @@
-from sqlalchemy import Column, DateTime, JSON, String, Text, ForeignKey, DECIMAL, Boolean
+from sqlalchemy import Column, DateTime, String, Text, ForeignKey, DECIMAL, Boolean, Index, Integer, LargeBinary
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
+from app.payload_codec import FORMAT_VERSION, decode_payload, encode_payload
+
 Base = declarative_base()
 
 class Relatorio(Base):
@@ -16,11 +19,47 @@ class Relatorio(Base):
     operadora = Column(String(100), index=True)
     cidade = Column(String(100), index=True)
     status = Column(String(20))
-    payload = Column(JSON)
     observacoes = Column(Text)
 
     fotos = relationship("Foto", back_populates="relatorio", cascade="all, delete-orphan")
     user = relationship("User", back_populates="relatorios")
+    payload_blob = relationship(
+        "RelatorioPayload",
+        uselist=False,
+        back_populates="relatorio",
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def payload(self):
+        blob = self.payload_blob
+        if blob is None:
+            return None
+        return decode_payload(blob.data, blob.encoding, blob.format_version)
+
+    @payload.setter
+    def payload(self, value):
+        data, encoding, raw_size = encode_payload(value)
+        if self.payload_blob is None:
+            self.payload_blob = RelatorioPayload()
+        self.payload_blob.format_version = FORMAT_VERSION
+        self.payload_blob.encoding = encoding
+        self.payload_blob.raw_size = raw_size
+        self.payload_blob.data = data
+
+
+class RelatorioPayload(Base):
+    """Documento completo do relatorio, comprimido e fora da tabela principal."""
+
+    __tablename__ = "relatorio_payloads"
+
+    relatorio_id = Column(String(36), ForeignKey("relatorios.id"), primary_key=True)
+    format_version = Column(Integer, nullable=False)
+    encoding = Column(String(10), nullable=False)
+    raw_size = Column(Integer)
+    data = Column(LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"))
+
+    relatorio = relationship("Relatorio", back_populates="payload_blob")
 
 class Foto(Base):
     __tablename__ = "fotos"
@@ -31,10 +70,13 @@ class Foto(Base):
     path = Column(String(255))
     coords_lat = Column(DECIMAL(10, 7))
     coords_lng = Column(DECIMAL(10, 7))
+    geohash = Column(String(12), index=True)
     created_at = Column(DateTime, server_default=func.now())
 
     relatorio = relationship("Relatorio", back_populates="fotos")
 
+    __table_args__ = (Index("ix_fotos_coords", "coords_lat", "coords_lng"),)
+
 
 class User(Base):
     __tablename__ = "users"
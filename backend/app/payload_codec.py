@@ -0,0 +1,48 @@
+import json
+import zlib
+from typing import Any, Dict, Tuple
+
+from app.config import settings
+
+FORMAT_VERSION = 1
+
+
+class PayloadCodecError(RuntimeError):
+    pass
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise PayloadCodecError("zstandard nao instalado") from exc
+    return zstandard
+
+
+def encode_payload(payload: Dict[str, Any] | None) -> Tuple[bytes, str, int]:
+    """Serializa e comprime o payload. Retorna (dados, encoding, tamanho original)."""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    encoding = settings.payload_compression
+    if encoding == "zstd":
+        data = _zstd().ZstdCompressor(level=settings.payload_compression_level).compress(raw)
+    elif encoding == "zlib":
+        data = zlib.compress(raw, settings.payload_compression_level)
+    elif encoding == "none":
+        data = raw
+    else:
+        raise PayloadCodecError(f"Compressao de payload desconhecida: {encoding}")
+    return data, encoding, len(raw)
+
+
+def decode_payload(data: bytes, encoding: str, format_version: int) -> Dict[str, Any] | None:
+    if format_version != FORMAT_VERSION:
+        raise PayloadCodecError(f"Versao de payload nao suportada: {format_version}")
+    if encoding == "zstd":
+        raw = _zstd().ZstdDecompressor().decompress(data)
+    elif encoding == "zlib":
+        raw = zlib.decompress(data)
+    elif encoding == "none":
+        raw = data
+    else:
+        raise PayloadCodecError(f"Compressao de payload desconhecida: {encoding}")
+    return json.loads(raw)
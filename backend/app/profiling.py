@@ -0,0 +1,155 @@
+import functools
+import hmac
+import inspect
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.request_context import RequestContext, current_request, mark_thread
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}:{frame.f_lineno}"
+
+
+class StackSampler:
+    """Amostra periodicamente as pilhas das threads que atendem uma requisicao.
+
+    As rotas sincronas rodam no threadpool; mark_thread e o hook de consultas
+    do banco registram em ctx.thread_ids as threads usadas pela requisicao, e
+    so elas sao amostradas. Requisicoes simultaneas nao entram no perfil.
+    """
+
+    def __init__(self, ctx: RequestContext, interval: float):
+        self.ctx = ctx
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            thread_ids = tuple(self.ctx.thread_ids or ())
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                # A thread pode ja ter voltado ao pool; pilha parada no worker nao e da requisicao.
+                if any(label.startswith("app.") for label in stack):
+                    self.samples[";".join(reversed(stack))] += 1
+
+
+def _should_profile(headers: Headers) -> bool:
+    value = headers.get(PROFILE_HEADER)
+    if value is not None:
+        # Sem segredo configurado o header e ignorado.
+        secret = settings.profiling_secret or settings.api_key
+        return bool(secret) and hmac.compare_digest(value.encode(), secret.encode())
+    return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+
+def _write_profile(path: str, samples: Counter) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """Perfil amostrado por requisicao, ligado pelo header X-Profile (com PROFILING_SECRET) ou por PROFILING_SAMPLE_RATE.
+
+    O resultado vai para PROFILING_DIR no formato "collapsed stacks", que
+    pode ser aberto no speedscope ou no flamegraph.pl.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        ctx = current_request.get()
+        if scope["type"] != "http" or ctx is None or not _should_profile(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+        ctx.thread_ids = set()
+        sampler = StackSampler(ctx, settings.profiling_interval_ms / 1000.0)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            route = ctx.route
+            slug = re.sub(r"[^a-zA-Z0-9]+", "_", route).strip("_") or "root"
+            filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}.collapsed"
+            path = os.path.join(settings.profiling_dir, filename)
+            try:
+                await run_in_threadpool(_write_profile, path, sampler.samples)
+            except OSError:
+                logger.exception("Falha ao gravar perfil em %s", path)
+            else:
+                logger.info(
+                    "perfil %s %s: %.1f ms, %d amostras -> %s",
+                    scope["method"],
+                    route,
+                    elapsed_ms,
+                    sum(sampler.samples.values()),
+                    path,
+                )
+
+
+class ProfiledRoute(APIRoute):
+    """Rota cujo endpoint sincrono registra a propria thread antes de rodar.
+
+    O AnyIO pode executar o endpoint numa thread do pool diferente da usada
+    pelas dependencias; sem isso o trecho antes da primeira consulta SQL
+    (ex.: gravacao das fotos) ficaria fora do perfil.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _marking_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _marking_thread(endpoint):
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        mark_thread()
+        return endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+# Com o perfil desligado as rotas ficam com a classe padrao, sem custo extra.
+route_class = ProfiledRoute if settings.profiling_enabled else APIRoute
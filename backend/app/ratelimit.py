@@ -0,0 +1,129 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException, Request
+
+from app import models
+from app.auth import AUTH_DISABLED, get_current_user
+from app.config import settings
+
+
+class TokenBucketLimiter:
+    """Token bucket por chave, em memoria (vale por processo/worker)."""
+
+    def __init__(self, per_minute: int, burst: int, max_keys: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = float(max(burst, 1))
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def _wait(self, tokens: float) -> float:
+        if tokens >= 1.0:
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1.0 - tokens) / self.rate
+
+    def peek(self, key: str) -> float:
+        """Como acquire, mas sem consumir o token."""
+        with self._lock:
+            return self._wait(self._refill(key, time.monotonic())[0])
+
+    def acquire(self, key: str) -> float:
+        """Consome um token. Retorna 0 se liberado ou os segundos ate o proximo token."""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            retry_after = self._wait(bucket[0])
+            if not retry_after:
+                bucket[0] -= 1.0
+            return retry_after
+
+
+user_limiter = TokenBucketLimiter(settings.rate_limit_user_per_minute, settings.rate_limit_user_burst)
+login_limiter = TokenBucketLimiter(settings.rate_limit_login_per_minute, settings.rate_limit_login_burst)
+login_ip_limiter = TokenBucketLimiter(settings.rate_limit_login_ip_per_minute, settings.rate_limit_login_ip_burst)
+_heavy_slots = asyncio.Semaphore(max(settings.heavy_max_concurrency, 1))
+
+
+def _too_many(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Muitas requisicoes, tente novamente mais tarde",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _user_key(request: Request, user: models.User) -> str:
+    # Com AUTH_DISABLED todos viram o usuario "public"; um bucket so para ele
+    # seria um limite global, entao o bucket passa a ser por IP.
+    if AUTH_DISABLED or user.username == "public":
+        return f"ip:{request.client.host if request.client else 'desconhecido'}"
+    return f"user:{user.id}"
+
+
+def rate_limited_user(request: Request, user: models.User = Depends(get_current_user)) -> models.User:
+    if settings.rate_limit_enabled:
+        retry_after = user_limiter.acquire(_user_key(request, user))
+        if retry_after:
+            raise _too_many(retry_after)
+    return user
+
+
+def check_login_rate(username: str, client_ip: str | None) -> None:
+    """Bucket por usuario e, com limites bem maiores, por IP (varios usuarios podem vir do mesmo NAT/proxy).
+
+    Os dois buckets sao verificados antes de consumir de qualquer um, para uma
+    tentativa recusada nao gastar o token do outro.
+    """
+    if not settings.rate_limit_enabled:
+        return
+    checks = [(login_limiter, f"user:{username.lower()}")]
+    if client_ip:
+        checks.append((login_ip_limiter, f"ip:{client_ip}"))
+    retry_after = max(limiter.peek(key) for limiter, key in checks)
+    if retry_after:
+        raise _too_many(retry_after)
+    for limiter, key in checks:
+        retry_after = limiter.acquire(key)
+        if retry_after:
+            raise _too_many(retry_after)
+
+
+async def heavy_slot_user(user: models.User = Depends(rate_limited_user)) -> models.User:
+    """Usuario autenticado e dentro do rate limit, segurando uma das vagas de gravacao pesada.
+
+    Autenticacao e token bucket rodam antes de entrar na fila; a espera pela
+    vaga e assincrona e nao prende uma thread do threadpool.
+    """
+    if not settings.rate_limit_enabled:
+        yield user
+        return
+    try:
+        await asyncio.wait_for(_heavy_slots.acquire(), timeout=settings.heavy_queue_timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente",
+            headers={"Retry-After": str(max(1, math.ceil(settings.heavy_queue_timeout)))},
+        )
+    try:
+        yield user
+    finally:
+        _heavy_slots.release()
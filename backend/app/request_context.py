@@ -0,0 +1,77 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, List
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestContext:
+    """Estado de uma requisicao HTTP compartilhado entre middleware, banco e storage.
+
+    O objeto e mutavel de proposito: as rotas sincronas rodam no threadpool com
+    uma copia do contexto, mas a copia aponta para o mesmo objeto.
+    """
+
+    __slots__ = ("method", "path", "route", "query_count", "query_seconds", "slow_queries", "thread_ids")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route = "unmatched"
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.slow_queries = 0
+        # Threads do threadpool que executaram codigo desta requisicao; so e
+        # preenchido quando o ProfilingMiddleware liga o perfil.
+        self.thread_ids: set[int] | None = None
+
+
+current_request: ContextVar[RequestContext | None] = ContextVar("current_request", default=None)
+
+# Chamados ao fim de cada requisicao com (contexto, status, duracao em segundos).
+request_end_hooks: List[Callable[[RequestContext, str, float], None]] = []
+
+
+async def bind_route(request: Request) -> None:
+    """Dependencia global: registra o template da rota antes do handler rodar."""
+    ctx = current_request.get()
+    route = request.scope.get("route")
+    if ctx is not None and route is not None:
+        ctx.route = route.path_format
+
+
+def mark_thread() -> None:
+    """Dependencia global sincrona: registra a thread do threadpool que atende a requisicao."""
+    ctx = current_request.get()
+    if ctx is not None and ctx.thread_ids is not None:
+        ctx.thread_ids.add(threading.get_ident())
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = RequestContext(scope["method"], scope["path"])
+        token = current_request.set(ctx)
+        status = "500"
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            for hook in request_end_hooks:
+                hook(ctx, status, elapsed)
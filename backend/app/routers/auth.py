@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app import models
 from app.auth import create_access_token, create_user, verify_password
+from app.ratelimit import check_login_rate
+from app.profiling import route_class
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=route_class)
 
 
 class RegisterIn(BaseModel):
@@ -20,8 +22,9 @@ class LoginIn(BaseModel):
 
 
 @router.post("/register")
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
+def register(payload: RegisterIn, request: Request, db: Session = Depends(get_db)):
     username = payload.username.strip()
+    check_login_rate(username, request.client.host if request.client else None)
     if not username or not payload.password:
         raise HTTPException(status_code=400, detail="Usuario e senha obrigatorios")
     exists = db.query(models.User).filter(models.User.username == username).first()
@@ -33,8 +36,9 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(payload: LoginIn, db: Session = Depends(get_db)):
+def login(payload: LoginIn, request: Request, db: Session = Depends(get_db)):
     username = payload.username.strip()
+    check_login_rate(username, request.client.host if request.client else None)
     user = db.query(models.User).filter(models.User.username == username).first()
     if not user or not verify_password(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Credenciais invalidas")
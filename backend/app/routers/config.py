@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
 from app.config import settings
+from app.profiling import route_class
 
-router = APIRouter(prefix="/config", tags=["config"])
+router = APIRouter(prefix="/config", tags=["config"], route_class=route_class)
 
 
 @router.get("")
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app import models, schemas, crud
+from app.auth import get_current_user
+from app.profiling import route_class
+
+router = APIRouter(prefix="/fotos", tags=["fotos"], route_class=route_class)
+
+
+@router.get("/bbox", response_model=list[schemas.FotoGeoOut])
+def list_fotos_bbox(
+    min_lat: float = Query(ge=-90, le=90),
+    min_lng: float = Query(ge=-180, le=180),
+    max_lat: float = Query(ge=-90, le=90),
+    max_lng: float = Query(ge=-180, le=180),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="bbox invalida")
+    fotos = crud.fotos_in_bbox(db, user.id, min_lat, min_lng, max_lat, max_lng, limit)
+    return [_to_foto_geo_out(f) for f in fotos]
+
+
+@router.get("/proximas", response_model=list[schemas.FotoGeoOut])
+def list_fotos_proximas(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    k: int = Query(default=20, ge=1, le=500),
+    raio_km: float | None = Query(default=None, gt=0, le=crud.NEAREST_MAX_RADIUS_KM),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    resultados = crud.fotos_nearest(db, user.id, lat, lng, k, raio_km)
+    return [_to_foto_geo_out(f, dist) for f, dist in resultados]
+
+
+def _to_foto_geo_out(foto: models.Foto, distancia_km: float | None = None) -> schemas.FotoGeoOut:
+    return schemas.FotoGeoOut(
+        id=foto.id,
+        relatorio_id=foto.relatorio_id,
+        site_id=foto.relatorio.site_id if foto.relatorio else None,
+        categoria=foto.categoria,
+        url=foto.path,
+        coords_lat=float(foto.coords_lat) if foto.coords_lat is not None else None,
+        coords_lng=float(foto.coords_lng) if foto.coords_lng is not None else None,
+        distancia_km=distancia_km,
+    )
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.metrics import render_prometheus
+from app.profiling import route_class
+
+router = APIRouter(tags=["metrics"], route_class=route_class)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(authorization: str | None = Header(default=None)):
+    if settings.api_key and authorization != f"Bearer {settings.api_key}":
+        raise HTTPException(status_code=401, detail="Token invalido")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -4,15 +4,17 @@ from sqlalchemy.orm import Session
 from app.db import get_db
 from app import models, schemas, crud
 from app.auth import get_current_user
+from app.ratelimit import heavy_slot_user
+from app.profiling import route_class
 
-router = APIRouter(prefix="/rascunhos", tags=["rascunhos"])
+router = APIRouter(prefix="/rascunhos", tags=["rascunhos"], route_class=route_class)
 
 
 @router.post("", response_model=schemas.RelatorioOut)
 def create_rascunho(
     payload: dict,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(heavy_slot_user),
 ):
     if not payload:
         raise HTTPException(status_code=400, detail="Payload vazio")
@@ -28,7 +30,7 @@ def update_rascunho(
     payload: dict,
     replace_photos: bool = Query(default=True),
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(heavy_slot_user),
 ):
     relatorio = (
         db.query(models.Relatorio)
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.db import get_db
 from app import models, schemas, crud
 from app.auth import get_current_user
+from app.ratelimit import heavy_slot_user
+from app.profiling import route_class
 
-router = APIRouter(prefix="/relatorios", tags=["relatorios"])
+router = APIRouter(prefix="/relatorios", tags=["relatorios"], route_class=route_class)
 
 @router.post("", response_model=schemas.RelatorioOut)
 def create_relatorio(
     payload: dict,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(heavy_slot_user),
 ):
     if not payload:
         raise HTTPException(status_code=400, detail="Payload vazio")
@@ -23,10 +25,13 @@ def list_relatorios(
     site_id: str | None = Query(default=None),
     operadora: str | None = Query(default=None),
     cidade: str | None = Query(default=None),
+    incluir_payload: bool = Query(default=False),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
     q = db.query(models.Relatorio).filter(models.Relatorio.user_id == user.id)
+    if incluir_payload:
+        q = q.options(selectinload(models.Relatorio.payload_blob))
     if site_id:
         q = q.filter(models.Relatorio.site_id == site_id)
     if operadora:
@@ -34,7 +39,7 @@ def list_relatorios(
     if cidade:
         q = q.filter(models.Relatorio.cidade == cidade)
     relatorios = q.order_by(models.Relatorio.created_at.desc()).limit(100).all()
-    return [_to_relatorio_out(r) for r in relatorios]
+    return [_to_relatorio_out(r, incluir_payload=incluir_payload) for r in relatorios]
 
 @router.get("/{relatorio_id}", response_model=schemas.RelatorioOut)
 def get_relatorio(
@@ -57,7 +62,7 @@ def update_relatorio(
     payload: dict,
     replace_photos: bool = Query(default=False),
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(heavy_slot_user),
 ):
     relatorio = (
         db.query(models.Relatorio)
@@ -69,7 +74,7 @@ def update_relatorio(
     relatorio = crud.update_relatorio(db, relatorio, payload, replace_photos)
     return _to_relatorio_out(relatorio)
 
-def _to_relatorio_out(relatorio: models.Relatorio) -> schemas.RelatorioOut:
+def _to_relatorio_out(relatorio: models.Relatorio, incluir_payload: bool = True) -> schemas.RelatorioOut:
     fotos = [
         schemas.FotoOut(
             id=f.id,
@@ -87,6 +92,6 @@ def _to_relatorio_out(relatorio: models.Relatorio) -> schemas.RelatorioOut:
         operadora=relatorio.operadora,
         cidade=relatorio.cidade,
         status=relatorio.status,
-        payload=relatorio.payload,
+        payload=relatorio.payload if incluir_payload else None,
         fotos=fotos,
     )
@@ -10,10 +10,11 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.db import get_db
 from app import models
-from app.auth import get_current_user
+from app.ratelimit import rate_limited_user
 from app.storage import create_presigned_get_url, create_presigned_post, StorageError
+from app.profiling import route_class
 
-router = APIRouter(prefix="/uploads", tags=["uploads"])
+router = APIRouter(prefix="/uploads", tags=["uploads"], route_class=route_class)
 
 
 class PresignRequest(BaseModel):
@@ -41,7 +42,7 @@ def _safe_segment(value: str) -> str:
 def presign_upload(
     payload: PresignRequest,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(rate_limited_user),
 ):
     if settings.storage_backend != "s3":
         raise HTTPException(status_code=400, detail="Storage backend nao configurado para s3")
@@ -93,7 +94,7 @@ def presign_upload(
 def presign_download(
     payload: PresignGetRequest,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    user=Depends(rate_limited_user),
 ):
     if settings.storage_backend != "s3":
         raise HTTPException(status_code=400, detail="Storage backend nao configurado para s3")
@@ -17,3 +17,8 @@ class RelatorioOut(BaseModel):
     status: Optional[str] = None
     payload: Optional[Dict[str, Any]] = None
     fotos: List[FotoOut] = []
+
+class FotoGeoOut(FotoOut):
+    relatorio_id: str
+    site_id: Optional[str] = None
+    distancia_km: Optional[float] = None
@@ -3,6 +3,7 @@ import os
 import uuid
 from typing import Tuple
 
+from app import metrics
 from app.config import settings
 
 class StorageError(RuntimeError):
@@ -27,11 +28,13 @@ def save_data_url(data_url: str, folder: str) -> str:
         raise StorageError("Storage backend not implemented")
 
     raw, ext = _parse_data_url(data_url)
-    os.makedirs(folder, exist_ok=True)
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    full_path = os.path.join(folder, filename)
-    with open(full_path, "wb") as f:
-        f.write(raw)
+    with metrics.storage_duration.time("write"):
+        os.makedirs(folder, exist_ok=True)
+        filename = f"{uuid.uuid4().hex}.{ext}"
+        full_path = os.path.join(folder, filename)
+        with open(full_path, "wb") as f:
+            f.write(raw)
+    metrics.photo_bytes_ingested.inc(len(raw))
 
     if settings.storage_public_base_url:
         rel_path = os.path.relpath(full_path, settings.storage_dir).replace("\\", "/")
@@ -56,27 +59,28 @@ def create_presigned_put_url(key: str, content_type: str | None) -> dict:
     if not settings.aws_s3_bucket:
         raise StorageError("AWS_S3_BUCKET nao configurado")
 
-    import boto3
-    client = boto3.client(
-        "s3",
-        region_name=settings.aws_region or None,
-        endpoint_url=settings.aws_s3_endpoint_url or None,
-    )
-    resolved_content_type = content_type or "application/octet-stream"
-    params = {
-        "Bucket": settings.aws_s3_bucket,
-        "Key": key,
-        "ContentType": resolved_content_type,
-    }
-    if settings.aws_s3_acl:
-        params["ACL"] = settings.aws_s3_acl
-
-    url = client.generate_presigned_url(
-        "put_object",
-        Params=params,
-        ExpiresIn=settings.aws_s3_presign_ttl,
-        HttpMethod="PUT",
-    )
+    # O tempo inclui a criacao do client do boto3, que e a parte cara do presign.
+    with metrics.storage_duration.time("presign_put"):
+        import boto3
+        client = boto3.client(
+            "s3",
+            region_name=settings.aws_region or None,
+            endpoint_url=settings.aws_s3_endpoint_url or None,
+        )
+        resolved_content_type = content_type or "application/octet-stream"
+        params = {
+            "Bucket": settings.aws_s3_bucket,
+            "Key": key,
+            "ContentType": resolved_content_type,
+        }
+        if settings.aws_s3_acl:
+            params["ACL"] = settings.aws_s3_acl
+        url = client.generate_presigned_url(
+            "put_object",
+            Params=params,
+            ExpiresIn=settings.aws_s3_presign_ttl,
+            HttpMethod="PUT",
+        )
     return {
         "upload_url": url,
         "object_key": key,
@@ -92,32 +96,32 @@ def create_presigned_post(key: str, content_type: str | None, max_bytes: int) ->
     if not settings.aws_s3_bucket:
         raise StorageError("AWS_S3_BUCKET nao configurado")
 
-    import boto3
-    client = boto3.client(
-        "s3",
-        region_name=settings.aws_region or None,
-        endpoint_url=settings.aws_s3_endpoint_url or None,
-    )
-
-    resolved_content_type = content_type or "application/octet-stream"
-    fields = {
-        "Content-Type": resolved_content_type,
-    }
-    conditions = [
-        {"Content-Type": resolved_content_type},
-        ["content-length-range", 1, max_bytes],
-    ]
-    if settings.aws_s3_acl:
-        fields["ACL"] = settings.aws_s3_acl
-        conditions.append({"ACL": settings.aws_s3_acl})
-
-    post = client.generate_presigned_post(
-        Bucket=settings.aws_s3_bucket,
-        Key=key,
-        Fields=fields,
-        Conditions=conditions,
-        ExpiresIn=settings.aws_s3_presign_ttl,
-    )
+    with metrics.storage_duration.time("presign_post"):
+        import boto3
+        client = boto3.client(
+            "s3",
+            region_name=settings.aws_region or None,
+            endpoint_url=settings.aws_s3_endpoint_url or None,
+        )
+
+        resolved_content_type = content_type or "application/octet-stream"
+        fields = {
+            "Content-Type": resolved_content_type,
+        }
+        conditions = [
+            {"Content-Type": resolved_content_type},
+            ["content-length-range", 1, max_bytes],
+        ]
+        if settings.aws_s3_acl:
+            fields["ACL"] = settings.aws_s3_acl
+            conditions.append({"ACL": settings.aws_s3_acl})
+        post = client.generate_presigned_post(
+            Bucket=settings.aws_s3_bucket,
+            Key=key,
+            Fields=fields,
+            Conditions=conditions,
+            ExpiresIn=settings.aws_s3_presign_ttl,
+        )
     return {
         "upload_url": post["url"],
         "fields": post["fields"],
@@ -133,18 +137,19 @@ def create_presigned_get_url(key: str) -> dict:
     if not settings.aws_s3_bucket:
         raise StorageError("AWS_S3_BUCKET nao configurado")
 
-    import boto3
-    client = boto3.client(
-        "s3",
-        region_name=settings.aws_region or None,
-        endpoint_url=settings.aws_s3_endpoint_url or None,
-    )
-    url = client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": settings.aws_s3_bucket, "Key": key},
-        ExpiresIn=settings.aws_s3_presign_ttl,
-        HttpMethod="GET",
-    )
+    with metrics.storage_duration.time("presign_get"):
+        import boto3
+        client = boto3.client(
+            "s3",
+            region_name=settings.aws_region or None,
+            endpoint_url=settings.aws_s3_endpoint_url or None,
+        )
+        url = client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": settings.aws_s3_bucket, "Key": key},
+            ExpiresIn=settings.aws_s3_presign_ttl,
+            HttpMethod="GET",
+        )
     return {
         "download_url": url,
         "object_key": key,
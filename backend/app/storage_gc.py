@@ -0,0 +1,324 @@
+"""Coleta de fotos orfas no storage (local ou S3).
+
+Percorre o storage em ordem de chave, em lotes, e apaga os arquivos que nao
+aparecem em nenhum Foto.path e sao mais antigos que GC_GRACE_SECONDS. O
+progresso fica em GC_CHECKPOINT_PATH para a proxima execucao continuar de onde
+parou. Um lock de arquivo (GC_CHECKPOINT_PATH + ".lock") impede duas execucoes
+ao mesmo tempo, seja de outro worker ou do comando via cron.
+
+Uso (a partir de backend/):
+    python -m app.storage_gc --dry-run
+    python -m app.storage_gc --batch-size 500 --max-batches 20
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import metrics, models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+# (chave, mtime em epoch)
+Blob = Tuple[str, float]
+
+
+def _load_checkpoint() -> Dict:
+    try:
+        with open(settings.gc_checkpoint_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("backend") != settings.storage_backend:
+        return {}
+    return data
+
+
+def _save_checkpoint(data: Dict) -> None:
+    folder = os.path.dirname(os.path.abspath(settings.gc_checkpoint_path))
+    os.makedirs(folder, exist_ok=True)
+    tmp = f"{settings.gc_checkpoint_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, settings.gc_checkpoint_path)
+
+
+def _try_lock(f) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        # Windows: trava o primeiro byte do arquivo.
+        import msvcrt
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(f) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _gc_lock() -> Iterator[bool]:
+    """Lock exclusivo e nao bloqueante; devolve False se outra execucao ja o tem."""
+    path = f"{settings.gc_checkpoint_path}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a+") as f:
+        if not _try_lock(f):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            _unlock(f)
+
+
+def _iter_local_blobs(start_after: str | None) -> Iterator[Blob]:
+    base = settings.storage_dir
+    if not os.path.isdir(base):
+        return
+    start_dir = start_after.split("/", 1)[0] if start_after else None
+    for folder in sorted(os.listdir(base)):
+        if folder.startswith(".") or (start_dir and folder < start_dir):
+            continue
+        folder_path = os.path.join(base, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for filename in sorted(os.listdir(folder_path)):
+            key = f"{folder}/{filename}"
+            if start_after and key <= start_after:
+                continue
+            full_path = os.path.join(folder_path, filename)
+            try:
+                mtime = os.path.getmtime(full_path)
+            except OSError:
+                continue
+            yield key, mtime
+
+
+def _s3_client():
+    import boto3
+    return boto3.client(
+        "s3",
+        region_name=settings.aws_region or None,
+        endpoint_url=settings.aws_s3_endpoint_url or None,
+    )
+
+
+def _iter_s3_blobs(start_after: str | None) -> Iterator[Blob]:
+    prefix = (settings.aws_s3_prefix or "relatorios").rstrip("/") + "/"
+    params = {"Bucket": settings.aws_s3_bucket, "Prefix": prefix}
+    if start_after:
+        params["StartAfter"] = start_after
+    paginator = _s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(**params):
+        for obj in page.get("Contents", []):
+            yield obj["Key"], obj["LastModified"].timestamp()
+
+
+def _relatorio_ids_for(key: str) -> List[str]:
+    """Ids de relatorio presentes na chave (pasta local ou visita_id do presign)."""
+    segments = key.split("/")[:1] if settings.storage_backend == "local" else key.split("/")
+    return [segment for segment in segments if _UUID_RE.match(segment)]
+
+
+def _find_orphans(db: Session, blobs: List[Blob], cutoff: float) -> List[str]:
+    """Chaves do lote que nao sao referenciadas por nenhuma foto e ja passaram da carencia.
+
+    Os nomes de arquivo sao uuid4, entao a comparacao e pelo nome final do
+    Foto.path, que funciona tanto para caminho local quanto para URL publica.
+    Fotos de rascunhos ainda nao viraram Foto, por isso rascunhos sao ignorados.
+    """
+    old = [(key, mtime) for key, mtime in blobs if mtime < cutoff]
+    if not old:
+        return []
+    relatorio_ids = {rid for key, _ in old for rid in _relatorio_ids_for(key)}
+    referenced = set()
+    drafts = set()
+    if relatorio_ids:
+        rows = (
+            db.query(models.Relatorio.id, models.Relatorio.status, models.Foto.path)
+            .outerjoin(models.Foto, models.Foto.relatorio_id == models.Relatorio.id)
+            .filter(models.Relatorio.id.in_(relatorio_ids))
+            .all()
+        )
+        for relatorio_id, status, path in rows:
+            if status == "draft":
+                drafts.add(relatorio_id)
+            if path:
+                referenced.add(path.rstrip("/").rsplit("/", 1)[-1])
+
+    orphans = []
+    for key, _ in old:
+        ids = _relatorio_ids_for(key)
+        # Sem id de relatorio na chave nao da para saber a origem; nunca apaga.
+        if not ids or any(rid in drafts for rid in ids):
+            continue
+        if key.rsplit("/", 1)[-1] in referenced:
+            continue
+        orphans.append(key)
+    return orphans
+
+
+def _delete_local(keys: List[str]) -> int:
+    deleted = 0
+    folders = set()
+    for key in keys:
+        full_path = os.path.join(settings.storage_dir, *key.split("/"))
+        try:
+            os.remove(full_path)
+        except FileNotFoundError:
+            continue
+        deleted += 1
+        folders.add(os.path.dirname(full_path))
+    for folder in folders:
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+    return deleted
+
+
+def _delete_s3(keys: List[str]) -> int:
+    client = _s3_client()
+    deleted = 0
+    for i in range(0, len(keys), 1000):
+        chunk = keys[i:i + 1000]
+        resp = client.delete_objects(
+            Bucket=settings.aws_s3_bucket,
+            Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True},
+        )
+        deleted += len(chunk) - len(resp.get("Errors", []))
+    return deleted
+
+
+def run_gc(
+    db: Session,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    dry_run: bool = False,
+) -> Dict:
+    """Executa ate max_batches lotes e salva o checkpoint apos cada um.
+
+    Retorna um resumo; finished=True quando a varredura chegou ao fim do
+    storage (a proxima execucao recomeca do inicio) e skipped=True quando
+    outra execucao estava com o lock.
+    """
+    batch_size = batch_size or settings.gc_batch_size
+    if settings.storage_backend == "local":
+        iter_blobs, delete = _iter_local_blobs, _delete_local
+    elif settings.storage_backend == "s3":
+        iter_blobs, delete = _iter_s3_blobs, _delete_s3
+    else:
+        raise RuntimeError(f"Storage backend nao suportado: {settings.storage_backend}")
+
+    summary = {
+        "scanned": 0, "orphans": 0, "deleted": 0, "batches": 0,
+        "finished": False, "skipped": False, "dry_run": dry_run,
+    }
+    with _gc_lock() as locked:
+        if not locked:
+            summary["skipped"] = True
+            logger.info("storage gc: outra execucao em andamento, pulando")
+            return summary
+
+        checkpoint = _load_checkpoint()
+        last_key = checkpoint.get("last_key")
+        cutoff = time.time() - settings.gc_grace_seconds
+        blobs = iter_blobs(last_key)
+        while max_batches is None or summary["batches"] < max_batches:
+            batch = []
+            for blob in blobs:
+                batch.append(blob)
+                if len(batch) >= batch_size:
+                    break
+            if not batch:
+                summary["finished"] = True
+                break
+            orphans = _find_orphans(db, batch, cutoff)
+            summary["scanned"] += len(batch)
+            summary["orphans"] += len(orphans)
+            if orphans and not dry_run:
+                deleted = delete(orphans)
+                summary["deleted"] += deleted
+                metrics.storage_gc_deleted.inc(deleted)
+            summary["batches"] += 1
+            if not dry_run:
+                _save_checkpoint({"backend": settings.storage_backend, "last_key": batch[-1][0], "updated_at": time.time()})
+            if len(batch) < batch_size:
+                summary["finished"] = True
+                break
+
+        if summary["finished"] and not dry_run:
+            _save_checkpoint({"backend": settings.storage_backend, "last_key": None, "updated_at": time.time()})
+    logger.info("storage gc: %s", summary)
+    return summary
+
+
+def start_background_gc() -> threading.Event:
+    """Roda o GC a cada GC_INTERVAL_SECONDS numa thread daemon deste worker.
+
+    Devolve o Event que encerra o loop (usado no shutdown do app).
+    """
+    from app.db import SessionLocal
+
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(settings.gc_interval_seconds):
+            try:
+                with SessionLocal() as db:
+                    run_gc(db, max_batches=settings.gc_max_batches)
+            except Exception:
+                logger.exception("storage gc falhou")
+
+    threading.Thread(target=loop, name="storage-gc", daemon=True).start()
+    return stop
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Remove fotos orfas do storage")
+    parser.add_argument("--batch-size", type=int, default=settings.gc_batch_size)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--reset", action="store_true", help="ignora o checkpoint e recomeca do inicio")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from app.db import SessionLocal
+
+    if args.reset:
+        _save_checkpoint({"backend": settings.storage_backend, "last_key": None, "updated_at": time.time()})
+    with SessionLocal() as db:
+        summary = run_gc(db, args.batch_size, args.max_batches, args.dry_run)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+import sys
+import types
+from typing import Any, Dict
+
+from benchmarks.asgi_client import AsgiClient
+from benchmarks.harness import bench_async
+from benchmarks.payloads import make_payload
+
+
+class _FakeS3Client:
+    def generate_presigned_post(self, Bucket, Key, Fields, Conditions, ExpiresIn):
+        return {"url": f"https://{Bucket}.s3.amazonaws.com/", "fields": dict(Fields, key=Key)}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn, HttpMethod):
+        return f"https://{Params['Bucket']}.s3.amazonaws.com/{Params['Key']}?X-Amz-Signature=bench"
+
+
+def install_fake_boto3() -> None:
+    fake = types.ModuleType("boto3")
+    fake.client = lambda *args, **kwargs: _FakeS3Client()
+    sys.modules["boto3"] = fake
+
+
+def _setup_user() -> Dict[str, str]:
+    from app import models
+    from app.auth import create_access_token
+    from app.db import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = db.query(models.User).filter(models.User.username == "bench").first()
+        if not user:
+            user = models.User(id="bench-user", username="bench", password_hash="", is_active=True)
+            db.add(user)
+            db.commit()
+        user_id = user.id
+    return {"authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+async def run_api_benchmarks(
+    iterations: int,
+    concurrency: int,
+    payload_kb: int,
+    photos: int,
+    photo_kb: int,
+    seed_reports: int,
+) -> Dict[str, Any]:
+    from app.config import settings
+    from app.main import app
+
+    install_fake_boto3()
+    client = AsgiClient(app, headers=_setup_user())
+    payload = make_payload(payload_kb, photos, photo_kb, seed=1, site_id="SITE-BENCH")
+    draft_payload = make_payload(payload_kb, 0, photo_kb, seed=2, site_id="SITE-BENCH")
+
+    for i in range(seed_reports):
+        await client.json("POST", "/api/relatorios", json_body=make_payload(payload_kb, 1, 4, seed=100 + i))
+    target = await client.json("POST", "/api/relatorios", json_body=payload)
+    draft = await client.json("POST", "/api/rascunhos", json_body=draft_payload)
+
+    results: Dict[str, Any] = {}
+
+    async def create(_: int):
+        await client.json("POST", "/api/relatorios", json_body=payload)
+
+    async def update_draft(_: int):
+        await client.json("PUT", f"/api/rascunhos/{draft['id']}", json_body=draft_payload)
+
+    async def list_relatorios(_: int):
+        await client.json("GET", "/api/relatorios")
+
+    async def get_relatorio(_: int):
+        await client.json("GET", f"/api/relatorios/{target['id']}")
+
+    async def presign(i: int):
+        body = {
+            "filename": f"foto-{i}.jpg",
+            "content_type": "image/jpeg",
+            "size_bytes": photo_kb * 1024,
+            "site_id": "SITE-BENCH",
+            "visita_id": target["id"],
+            "categoria": "torre",
+        }
+        await client.json("POST", "/api/uploads/presign", json_body=body)
+
+    results["create"] = await bench_async(create, iterations, concurrency)
+    results["update_draft"] = await bench_async(update_draft, iterations, concurrency)
+    results["list"] = await bench_async(list_relatorios, iterations, concurrency)
+    results["get"] = await bench_async(get_relatorio, iterations, concurrency)
+
+    previous_backend = settings.storage_backend
+    settings.storage_backend = "s3"
+    settings.aws_s3_bucket = settings.aws_s3_bucket or "bench-bucket"
+    try:
+        results["presign"] = await bench_async(presign, iterations, concurrency)
+    finally:
+        settings.storage_backend = previous_backend
+    return results
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from typing import Any, Dict, Tuple
+from urllib.parse import urlencode
+
+
+class AsgiClient:
+    """Cliente minimo que chama o app ASGI em processo, sem rede nem httpx."""
+
+    def __init__(self, app, headers: Dict[str, str] | None = None):
+        self.app = app
+        self.headers = dict(headers or {})
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json_body: Any = None,
+        params: Dict[str, Any] | None = None,
+    ) -> Tuple[int, bytes]:
+        body = b"" if json_body is None else json.dumps(json_body).encode("utf-8")
+        headers = dict(self.headers)
+        if json_body is not None:
+            headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "query_string": urlencode(params or {}).encode("utf-8"),
+            "root_path": "",
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        done = asyncio.Event()
+        sent_body = False
+        status = 0
+        chunks = []
+
+        async def receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        done.set()
+        return status, b"".join(chunks)
+
+    async def json(self, method: str, path: str, expected: int = 200, **kwargs) -> Any:
+        status, content = await self.request(method, path, **kwargs)
+        if status != expected:
+            raise RuntimeError(f"{method} {path} -> {status}: {content[:200]!r}")
+        return json.loads(content) if content else None
@@ -0,0 +1,32 @@
+"""Compara dois arquivos gerados por benchmarks.run (antes x depois)."""
+import argparse
+import json
+import sys
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    for group in ("api", "micro"):
+        for name, new in after.get(group, {}).items():
+            old = before.get(group, {}).get(name)
+            if old is None:
+                print(f"{group:5} {name:22} (novo) {new[args.metric]:.3f}ms")
+                continue
+            a, b = old[args.metric], new[args.metric]
+            delta = (b - a) / a * 100.0 if a else 0.0
+            print(f"{group:5} {name:22} {a:10.3f}ms -> {b:10.3f}ms  {delta:+6.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def summarize(latencies: List[float], wall_seconds: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    n = len(ordered)
+
+    def pct(p: float) -> float:
+        if not ordered:
+            return 0.0
+        idx = min(n - 1, max(0, math.ceil(p / 100.0 * n) - 1))
+        return ordered[idx] * 1000.0
+
+    return {
+        "count": n,
+        "wall_seconds": wall_seconds,
+        "throughput_per_s": n / wall_seconds if wall_seconds > 0 else 0.0,
+        "mean_ms": (sum(ordered) / n * 1000.0) if n else 0.0,
+        "min_ms": ordered[0] * 1000.0 if n else 0.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000.0 if n else 0.0,
+    }
+
+
+def bench_sync(fn: Callable[[], Any], iterations: int, warmup: int = 10) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def bench_async(
+    fn: Callable[[int], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 5,
+) -> Dict[str, Any]:
+    for i in range(warmup):
+        await fn(-1 - i)
+    latencies: List[float] = []
+    sem = asyncio.Semaphore(max(concurrency, 1))
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def write_results(path: str, results: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,44 @@
+import random
+from typing import Any, Dict
+
+from benchmarks.harness import bench_sync
+from benchmarks.payloads import make_data_url, make_payload
+
+
+def run_micro_benchmarks(iterations: int, payload_kb: int, photo_kb: int) -> Dict[str, Any]:
+    from jose import jwt
+
+    from app import auth, models
+    from app.payload_codec import decode_payload, encode_payload
+    from app.routers.relatorios import _to_relatorio_out
+    from app.storage import _parse_data_url
+
+    results: Dict[str, Any] = {}
+
+    data_url = make_data_url(photo_kb * 1024, random.Random(3))
+    results["parse_data_url"] = bench_sync(lambda: _parse_data_url(data_url), iterations)
+
+    payload = make_payload(payload_kb, 0, photo_kb, seed=4)
+    encoded, encoding, _ = encode_payload(payload)
+    results["payload_encode"] = bench_sync(lambda: encode_payload(payload), iterations)
+    results["payload_decode"] = bench_sync(lambda: decode_payload(encoded, encoding, 1), iterations)
+
+    relatorio = models.Relatorio(
+        id="bench",
+        site_id=payload["siteId"],
+        operadora=payload["operadora"],
+        cidade=payload["cidade"],
+        status="sent",
+        payload=payload,
+    )
+    relatorio.fotos = [
+        models.Foto(id=f"foto-{i}", categoria="torre", path=f"/storage/bench/{i}.jpg", coords_lat=-23.5, coords_lng=-46.6)
+        for i in range(8)
+    ]
+    results["serialize_relatorio"] = bench_sync(lambda: _to_relatorio_out(relatorio).model_dump_json(), iterations)
+
+    token = auth.create_access_token("bench-user")
+    results["jwt_decode"] = bench_sync(
+        lambda: jwt.decode(token, auth.JWT_SECRET, algorithms=[auth.JWT_ALGORITHM]), iterations
+    )
+    return results
@@ -0,0 +1,59 @@
+import base64
+import random
+import string
+from typing import Any, Dict
+
+PHOTO_CATEGORIES = ("fachada", "torre", "quadro_energia", "shelter", "acesso", "vista_360")
+
+
+def _fake_jpeg(size_bytes: int, rng: random.Random) -> bytes:
+    header = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+    body = rng.randbytes(max(size_bytes - len(header) - 2, 0))
+    return header + body + b"\xff\xd9"
+
+
+def make_data_url(size_bytes: int, rng: random.Random) -> str:
+    encoded = base64.b64encode(_fake_jpeg(size_bytes, rng)).decode("ascii")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def make_payload(
+    size_kb: int = 16,
+    photos: int = 4,
+    photo_kb: int = 32,
+    seed: int = 0,
+    site_id: str | None = None,
+) -> Dict[str, Any]:
+    """Relatorio sintetico parecido com o que o formulario envia.
+
+    size_kb controla o tamanho aproximado dos campos de texto; as fotos vao
+    como data URLs em photosUploads, distribuidas pelas categorias.
+    """
+    rng = random.Random(seed)
+    campos = {}
+    total = 0
+    i = 0
+    while total < size_kb * 1024:
+        value = "".join(rng.choice(string.ascii_letters + " ") for _ in range(rng.randint(8, 120)))
+        campos[f"campo_{i}"] = value
+        total += len(value) + 12
+        i += 1
+
+    uploads: Dict[str, Any] = {}
+    for n in range(photos):
+        categoria = PHOTO_CATEGORIES[n % len(PHOTO_CATEGORIES)]
+        entry = uploads.setdefault(
+            categoria,
+            {"images": [], "coords": {"lat": -23.5 + rng.uniform(-1, 1), "lng": -46.6 + rng.uniform(-1, 1)}},
+        )
+        entry["images"].append(make_data_url(photo_kb * 1024, rng))
+
+    return {
+        "siteId": site_id or f"SITE-{rng.randint(1000, 9999)}",
+        "operadora": rng.choice(["Vivo", "Claro", "TIM"]),
+        "cidade": rng.choice(["Sao Paulo", "Campinas", "Santos"]),
+        "timestamp_iso": "2024-01-01T12:00:00Z",
+        "observacoes": "gerado pelo benchmark",
+        "campos": campos,
+        "photosUploads": uploads,
+    }
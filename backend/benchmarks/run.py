@@ -0,0 +1,94 @@
+"""Benchmarks offline do backend.
+
+Uso (a partir de backend/):
+    python -m benchmarks.run --iterations 200 --output bench.json
+    python -m benchmarks.compare antes.json depois.json
+"""
+import argparse
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _prepare_environment(workdir: str) -> None:
+    storage_dir = os.path.join(workdir, "storage")
+    os.makedirs(storage_dir, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["STORAGE_DIR"] = storage_dir
+    os.environ["STORAGE_PUBLIC_BASE_URL"] = ""
+    os.environ["AUTH_DISABLED"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["METRICS_DIR"] = ""
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de ingestao e leitura de relatorios")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--payload-kb", type=int, default=16)
+    parser.add_argument("--photos", type=int, default=4)
+    parser.add_argument("--photo-kb", type=int, default=32)
+    parser.add_argument("--seed-reports", type=int, default=100)
+    parser.add_argument("--only", choices=["api", "micro"], default=None)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="hh-bench-") as workdir:
+        _prepare_environment(workdir)
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        from benchmarks.harness import write_results
+
+        results = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "params": vars(args),
+            },
+        }
+        if args.only in (None, "micro"):
+            from benchmarks.micro import run_micro_benchmarks
+
+            results["micro"] = run_micro_benchmarks(args.iterations * 10, args.payload_kb, args.photo_kb)
+        if args.only in (None, "api"):
+            from benchmarks.api import run_api_benchmarks
+
+            results["api"] = asyncio.run(
+                run_api_benchmarks(
+                    args.iterations,
+                    args.concurrency,
+                    args.payload_kb,
+                    args.photos,
+                    args.photo_kb,
+                    args.seed_reports,
+                )
+            )
+
+    write_results(args.output, results)
+    for group in ("api", "micro"):
+        for name, stats in results.get(group, {}).items():
+            print(
+                f"{group:5} {name:22} {stats['throughput_per_s']:10.1f}/s "
+                f"p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms"
+            )
+    print(f"resultados em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
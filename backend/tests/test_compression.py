@@ -0,0 +1,200 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressionMiddleware, negotiate_encoding
+
+MAX_BYTES = 64 * 1024
+
+
+async def echo(request: Request):
+    body = await request.body()
+    return JSONResponse({"size": len(body), "content_length": request.headers.get("content-length")})
+
+
+async def small(request: Request):
+    return JSONResponse({"ok": True})
+
+
+async def large(request: Request):
+    return JSONResponse({"data": "x" * 5000})
+
+
+async def image(request: Request):
+    return Response(b"\xff\xd8" + b"0" * 5000, media_type="image/jpeg")
+
+
+def _client(minimum_size: int = 1024) -> TestClient:
+    app = Starlette(routes=[
+        Route("/echo", echo, methods=["POST"]),
+        Route("/small", small),
+        Route("/large", large),
+        Route("/image", image),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, max_request_bytes=MAX_BYTES)
+    return TestClient(app)
+
+
+def _post(client, body: bytes, encoding: str):
+    return client.post("/echo", content=body, headers={"Content-Encoding": encoding})
+
+
+def test_gzip_body_is_decoded():
+    raw = json.dumps({"a": "b" * 1000}).encode()
+    resp = _post(_client(), gzip.compress(raw), "gzip")
+    assert resp.status_code == 200
+    assert resp.json() == {"size": len(raw), "content_length": str(len(raw))}
+
+
+def test_unknown_encoding_is_rejected():
+    assert _post(_client(), b"abc", "br-custom").status_code == 415
+
+
+def test_compressed_size_over_cap_is_rejected():
+    resp = _post(_client(), b"\0" * (MAX_BYTES + 1), "gzip")
+    assert resp.status_code == 413
+
+
+def test_gzip_bomb_is_rejected():
+    bomb = gzip.compress(b"\0" * (10 * 1024 * 1024))
+    assert len(bomb) < MAX_BYTES
+    assert _post(_client(), bomb, "gzip").status_code == 413
+
+
+def test_gzip_trailing_member_is_rejected():
+    body = gzip.compress(b"{}") + gzip.compress(b" ")
+    assert _post(_client(), body, "gzip").status_code == 400
+
+
+def test_gzip_trailing_garbage_is_rejected():
+    assert _post(_client(), gzip.compress(b"{}") + b"x", "gzip").status_code == 400
+
+
+def test_gzip_truncated_stream_is_rejected():
+    assert _post(_client(), gzip.compress(b"{}" * 100)[:-6], "gzip").status_code == 400
+
+
+def test_invalid_gzip_is_rejected():
+    assert _post(_client(), b"nao e gzip", "gzip").status_code == 400
+
+
+def _run_asgi(chunks, encoding: str):
+    """Entrega o corpo em varias mensagens http.request, como um upload em partes."""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    received = {}
+    sent = []
+
+    async def inner(scope, receive, send):
+        message = await receive()
+        received["body"] = message["body"]
+        received["headers"] = dict(scope["headers"])
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-encoding", encoding.encode())]}
+    asyncio.run(CompressionMiddleware(inner, max_request_bytes=MAX_BYTES)(scope, receive, send))
+    return received, sent[0]["status"]
+
+
+def test_gzip_body_split_across_messages():
+    raw = b"{\"a\": \"" + b"c" * 20000 + b"\"}"
+    body = gzip.compress(raw)
+    received, status = _run_asgi([body[i:i + 100] for i in range(0, len(body), 100)], "gzip")
+    assert status == 204
+    assert received["body"] == raw
+    assert received["headers"][b"content-length"] == str(len(raw)).encode()
+    assert b"content-encoding" not in received["headers"]
+
+
+def test_gzip_bytes_after_end_in_later_message_are_rejected():
+    received, status = _run_asgi([gzip.compress(b"{}"), b"x"], "gzip")
+    assert status == 400
+    assert received == {}
+
+
+def test_zstd_body_is_decoded():
+    zstandard = pytest.importorskip("zstandard")
+    raw = json.dumps({"a": "b" * 1000}).encode()
+    resp = _post(_client(), zstandard.ZstdCompressor().compress(raw), "zstd")
+    assert resp.status_code == 200
+    assert resp.json()["size"] == len(raw)
+
+
+def test_zstd_bomb_is_rejected():
+    zstandard = pytest.importorskip("zstandard")
+    bomb = zstandard.ZstdCompressor().compress(b"\0" * (10 * 1024 * 1024))
+    assert len(bomb) < MAX_BYTES
+    assert _post(_client(), bomb, "zstd").status_code == 413
+
+
+def test_zstd_trailing_frame_is_rejected():
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor()
+    body = compressor.compress(b"{}") + compressor.compress(b" ")
+    assert _post(_client(), body, "zstd").status_code == 400
+
+
+def test_zstd_truncated_stream_is_rejected():
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(b"{\"a\": 1}" * 100)
+    assert _post(_client(), body[:-4], "zstd").status_code == 400
+
+
+def test_zstd_body_split_across_messages():
+    zstandard = pytest.importorskip("zstandard")
+    raw = b"{\"a\": \"" + b"c" * 20000 + b"\"}"
+    body = zstandard.ZstdCompressor().compress(raw)
+    received, status = _run_asgi([body[i:i + 7] for i in range(0, len(body), 7)], "zstd")
+    assert status == 204
+    assert received["body"] == raw
+
+
+def test_negotiate_encoding_respects_q_zero_and_wildcard():
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*;q=0") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("*, gzip;q=0") != "gzip"
+    assert negotiate_encoding("br;q=0, zstd;q=0, gzip;q=0.5") == "gzip"
+
+
+def test_small_responses_are_not_compressed():
+    resp = _client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+    assert resp.json() == {"ok": True}
+
+
+def test_large_json_responses_are_compressed():
+    resp = _client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in resp.headers["vary"].lower()
+    assert len(resp.json()["data"]) == 5000
+
+
+def test_minimum_size_is_configurable():
+    resp = _client(minimum_size=1).get("/small", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+
+
+def test_non_text_responses_pass_through():
+    resp = _client().get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+    assert resp.content.startswith(b"\xff\xd8")
@@ -0,0 +1,179 @@
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+_tmp = tempfile.mkdtemp(prefix="storage_gc_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'gc.db')}"
+os.environ["STORAGE_DIR"] = os.path.join(_tmp, "storage")
+os.environ["GC_CHECKPOINT_PATH"] = os.path.join(_tmp, "checkpoint.json")
+
+import pytest
+
+from app import models, storage_gc
+from app.config import settings
+from app.db import SessionLocal, engine
+
+OLD = time.time() - 30 * 24 * 3600
+
+
+@pytest.fixture(autouse=True)
+def gc_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    monkeypatch.setattr(settings, "storage_dir", str(tmp_path / "storage"))
+    monkeypatch.setattr(settings, "gc_checkpoint_path", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(settings, "gc_grace_seconds", 7 * 24 * 3600)
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+def _relatorio(db, status="sent", fotos=()):
+    relatorio_id = str(uuid.uuid4())
+    db.add(models.Relatorio(id=relatorio_id, status=status))
+    for path in fotos:
+        db.add(models.Foto(id=str(uuid.uuid4()), relatorio_id=relatorio_id, categoria="torre", path=path))
+    db.commit()
+    return relatorio_id
+
+
+def _blob(relatorio_id, mtime=OLD):
+    folder = os.path.join(settings.storage_dir, relatorio_id)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{uuid.uuid4().hex}.jpg")
+    with open(path, "wb") as f:
+        f.write(b"jpg")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_deletes_only_old_unreferenced_files(db):
+    relatorio_id = str(uuid.uuid4())
+    orphan = _blob(relatorio_id)
+    recent = _blob(relatorio_id, mtime=time.time())
+    kept = _blob(relatorio_id)
+    db.add(models.Relatorio(id=relatorio_id, status="sent"))
+    db.add(models.Foto(id=str(uuid.uuid4()), relatorio_id=relatorio_id, categoria="torre", path=kept))
+    db.commit()
+
+    summary = storage_gc.run_gc(db)
+
+    assert summary["deleted"] == 1
+    assert summary["finished"]
+    assert not os.path.exists(orphan)
+    assert os.path.exists(recent)
+    assert os.path.exists(kept)
+
+
+def test_draft_files_are_never_deleted(db):
+    draft_id = _relatorio(db, status="draft")
+    draft_blob = _blob(draft_id)
+    unknown = os.path.join(settings.storage_dir, "sem-id", "a.jpg")
+    os.makedirs(os.path.dirname(unknown))
+    open(unknown, "wb").close()
+    os.utime(unknown, (OLD, OLD))
+
+    summary = storage_gc.run_gc(db)
+
+    assert summary["scanned"] == 2
+    assert summary["deleted"] == 0
+    assert os.path.exists(draft_blob)
+    assert os.path.exists(unknown)
+
+
+def test_dry_run_keeps_files(db):
+    orphan = _blob(_relatorio(db))
+
+    summary = storage_gc.run_gc(db, dry_run=True)
+
+    assert summary["orphans"] == 1
+    assert summary["deleted"] == 0
+    assert os.path.exists(orphan)
+
+
+def test_resumes_from_checkpoint(db):
+    relatorio_id = _relatorio(db)
+    blobs = sorted(_blob(relatorio_id) for _ in range(3))
+
+    first = storage_gc.run_gc(db, batch_size=1, max_batches=1)
+    assert first["scanned"] == 1
+    assert not first["finished"]
+    assert storage_gc._load_checkpoint()["last_key"] == f"{relatorio_id}/{os.path.basename(blobs[0])}"
+
+    second = storage_gc.run_gc(db, batch_size=1, max_batches=1)
+    assert second["scanned"] == 1
+    assert not os.path.exists(blobs[1])
+    assert os.path.exists(blobs[2])
+
+    rest = storage_gc.run_gc(db, batch_size=1)
+    assert rest["finished"]
+    assert not os.path.exists(blobs[2])
+    assert storage_gc._load_checkpoint()["last_key"] is None
+
+
+def test_skips_when_another_run_holds_the_lock(db):
+    orphan = _blob(_relatorio(db))
+
+    with storage_gc._gc_lock() as locked:
+        assert locked
+        summary = storage_gc.run_gc(db)
+
+    assert summary["skipped"]
+    assert os.path.exists(orphan)
+
+
+def test_s3_keys_use_every_uuid_segment(monkeypatch):
+    visita_id = str(uuid.uuid4())
+    key = f"relatorios/SITE-1/{visita_id}/torre/{uuid.uuid4().hex}.jpg"
+
+    monkeypatch.setattr(settings, "storage_backend", "s3")
+    assert storage_gc._relatorio_ids_for(key) == [visita_id]
+    assert storage_gc._relatorio_ids_for(f"relatorios/SITE-1/torre/{uuid.uuid4().hex}.jpg") == []
+
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    assert storage_gc._relatorio_ids_for(f"{visita_id}/x.jpg") == [visita_id]
+    assert storage_gc._relatorio_ids_for(f"outro/{visita_id}/x.jpg") == []
+
+
+class _FakeS3:
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.deleted = []
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix, StartAfter=None):
+        modified = datetime.fromtimestamp(OLD, tz=timezone.utc)
+        keys = [k for k in self.keys if k.startswith(Prefix) and (StartAfter is None or k > StartAfter)]
+        yield {"Contents": [{"Key": k, "LastModified": modified} for k in keys]}
+
+    def delete_objects(self, Bucket, Delete):
+        self.deleted.extend(obj["Key"] for obj in Delete["Objects"])
+        return {}
+
+
+def test_s3_deletes_orphans_by_visita_id(db, monkeypatch):
+    sent_id = _relatorio(db)
+    draft_id = _relatorio(db, status="draft")
+    kept = f"relatorios/SITE/{sent_id}/torre/{uuid.uuid4().hex}.jpg"
+    orphan = f"relatorios/SITE/{sent_id}/torre/{uuid.uuid4().hex}.jpg"
+    draft = f"relatorios/SITE/{draft_id}/torre/{uuid.uuid4().hex}.jpg"
+    db.add(models.Foto(id=str(uuid.uuid4()), relatorio_id=sent_id, categoria="torre",
+                       path=f"https://bucket.s3.amazonaws.com/{kept}"))
+    db.commit()
+    fake = _FakeS3([kept, orphan, draft])
+    monkeypatch.setattr(settings, "storage_backend", "s3")
+    monkeypatch.setattr(settings, "aws_s3_prefix", "relatorios")
+    monkeypatch.setattr(storage_gc, "_s3_client", lambda: fake)
+
+    summary = storage_gc.run_gc(db)
+
+    assert summary["scanned"] == 3
+    assert fake.deleted == [orphan]